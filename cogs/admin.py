@@ -3,15 +3,22 @@ from discord.ext import commands
 from discord import app_commands
 import traceback
 import datetime
+import math
+import asyncio
 
 from ext.json_guilds import Guilds
 from ext.json_tickets import Tickets
+from ext.throttle import InteractionThrottle, ThrottledError
 
 
 def make_embed(title: str, description: str, color: discord.Color) -> discord.Embed:
     return discord.Embed(title=title, description=description, color=color)
 
 
+def save_error_embed() -> discord.Embed:
+    return make_embed(":no_entry: Error!", "Could not save the change. Please try again.", discord.Color.red())
+
+
 def status_line(status: str) -> str:
     if status == "Open":
         return ":green_circle: Open"
@@ -29,28 +36,53 @@ class OrderView(discord.ui.View):
 
     @discord.ui.button(label="Start Order", style=discord.ButtonStyle.primary, emoji="🧾", custom_id="tfp:create_ticket")
     async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
+        await self._throttled(interaction, "create_ticket", self._create_ticket)
+
+    @discord.ui.button(label="Notify Me", style=discord.ButtonStyle.secondary, emoji="🔔", custom_id="tfp:notify_me")
+    async def notify_me(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._throttled(interaction, "notify_me", self._toggle_notify)
+
+    async def _throttled(self, interaction: discord.Interaction, action: str, handler):
         if interaction.guild is None:
             embed = make_embed("Heads up", "This can only be used in a server.", discord.Color.orange())
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        # Rejected clicks and repeats of a finished click cost a single
+        # response, clicks during a running handler share its result embed
+        key = (interaction.guild.id, interaction.user.id, action)
+        try:
+            task = self.admin_cog.throttle.admit(key, lambda: handler(interaction))
+        except ThrottledError as e:
+            embed = make_embed(
+                ":hourglass: Slow down",
+                f"You're clicking too fast. Please try again in {math.ceil(e.retry_after)} seconds.",
+                discord.Color.orange(),
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        if task.done():
+            await interaction.response.send_message(embed=task.result(), ephemeral=True)
             return
 
+        await interaction.response.defer(ephemeral=True)
+        embed = await asyncio.shield(task)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    async def _create_ticket(self, interaction: discord.Interaction) -> discord.Embed:
         guild_data = await self.guilds.get_guild(interaction.guild.id)
         status = guild_data.get("status", "Closed")
 
         if status == "Closed":
-            embed = make_embed(":no_entry: Store closed", "Orders are not available right now.", discord.Color.red())
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
+            return make_embed(":no_entry: Store closed", "Orders are not available right now.", discord.Color.red())
 
         if status == "Paused":
-            embed = make_embed(
+            return make_embed(
                 "Store paused",
                 "Orders are temporarily paused. Press the **Notify Me** button to be alerted when we reopen.",
                 discord.Color.orange(),
             )
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
 
         # Limit check
         limit = guild_data.get("ticket_limit", 0)
@@ -63,20 +95,16 @@ class OrderView(discord.ui.View):
             today_count = 0
             
         if limit > 0 and today_count >= limit:
-            embed = make_embed(":no_entry: Limit reached", "The daily ticket limit has been reached. Please try again tomorrow.", discord.Color.red())
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
+            return make_embed(":no_entry: Limit reached", "The daily ticket limit has been reached. Please try again tomorrow.", discord.Color.red())
 
         category_id = guild_data.get("category_id")
         category = interaction.guild.get_channel(category_id)
         if category is None or not isinstance(category, discord.CategoryChannel):
-            embed = make_embed(
+            return make_embed(
                 "Missing category",
                 "Order category is missing. Please contact an admin.",
                 discord.Color.red(),
             )
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
 
         overwrites = {
             interaction.guild.default_role: discord.PermissionOverwrite(view_channel=False),
@@ -91,7 +119,9 @@ class OrderView(discord.ui.View):
             overwrites=overwrites,
         )
 
-        await self.tickets.insert_ticket(ticket_channel.id, interaction.user.id)
+        if not await self.tickets.insert_ticket(ticket_channel.id, interaction.user.id):
+            await ticket_channel.delete()
+            return save_error_embed()
         await self.guilds.increment_tickets_today(interaction.guild.id)
 
         # Update panel to reflect new count
@@ -103,16 +133,13 @@ class OrderView(discord.ui.View):
             discord.Color.blurple(),
         )
         await ticket_channel.send(embed=embed, view=CloseTicketView(self.tickets))
-        embed = make_embed(
+        return make_embed(
             "Ticket created",
             f"Your ticket has been created: {ticket_channel.mention}",
             discord.Color.green(),
         )
-        await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @discord.ui.button(label="Notify Me", style=discord.ButtonStyle.secondary, emoji="🔔", custom_id="tfp:notify_me")
-    async def notify_me(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
+    async def _toggle_notify(self, interaction: discord.Interaction) -> discord.Embed:
         try:
             guild_data = await self.guilds.get_guild(interaction.guild.id)
         except:
@@ -121,26 +148,24 @@ class OrderView(discord.ui.View):
         status = guild_data.get("status", "Closed")
 
         if status == "Open":
-            embed = make_embed("Store is open", "Orders are currently open! You can start one now.", discord.Color.green())
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
+            return make_embed("Store is open", "Orders are currently open! You can start one now.", discord.Color.green())
 
         notify_list = guild_data.get("notify", [])
         if interaction.user.id in notify_list:
-            await self.guilds.remove_notify(interaction.guild.id, interaction.user.id)
-            embed = make_embed(
+            if not await self.guilds.remove_notify(interaction.guild.id, interaction.user.id):
+                return save_error_embed()
+            return make_embed(
                 "Notifications removed",
                 "You have been removed from the notify list. You will no longer receive a DM when we reopen.",
                 discord.Color.red(),
             )
-        else:
-            await self.guilds.add_notify(interaction.guild.id, interaction.user.id)
-            embed = make_embed(
-                "Notification set",
-                "You have been added to the notify list. We will DM you when we reopen.",
-                discord.Color.orange(),
-            )
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        if not await self.guilds.add_notify(interaction.guild.id, interaction.user.id):
+            return save_error_embed()
+        return make_embed(
+            "Notification set",
+            "You have been added to the notify list. We will DM you when we reopen.",
+            discord.Color.orange(),
+        )
 
     async def _update_parent_panel(self, guild_id: int):
         guild_data = await self.guilds.get_guild(guild_id)
@@ -169,6 +194,11 @@ class Admin(commands.Cog):
         self.bot = bot
         self.guild = Guilds()
         self.tickets = Tickets()
+        # Shared by every OrderView instance, keyed by (guild, user, action)
+        self.throttle = InteractionThrottle(limits={
+            "create_ticket": (1, 10.0),
+            "notify_me": (2, 5.0),
+        })
         self.order_view = OrderView(self.guild, self.tickets, self)
         self.close_view = CloseTicketView(self.tickets)
 
@@ -179,6 +209,13 @@ class Admin(commands.Cog):
     async def cog_unload(self) -> None:
         self.bot.remove_view(self.order_view)
         self.bot.remove_view(self.close_view)
+        # Panels and tickets carry their own view instances bound to these stores,
+        # stop them so clicks go to the reloaded cog instead of closed writers
+        for view in self.bot.persistent_views:
+            if isinstance(view, (OrderView, CloseTicketView)):
+                view.stop()
+        await self.guild.close()
+        await self.tickets.close()
 
     @app_commands.command(name="setup", description="[ADMIN] Sets up the server with the bot")
     async def setup_bot(self, interaction : discord.Interaction):
@@ -229,7 +266,9 @@ class Admin(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        await self.guild.set_ticket_limit(interaction.guild.id, amount)
+        if not await self.guild.set_ticket_limit(interaction.guild.id, amount):
+            await interaction.followup.send(embed=save_error_embed(), ephemeral=True)
+            return
         guild_data = await self.guild.get_guild(interaction.guild.id)
         await self._update_order_panel(interaction.guild.id, guild_data.get("status", "Closed"))
         
@@ -251,13 +290,85 @@ class Admin(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        await self.guild.set_tickets_today(interaction.guild.id, amount)
+        if not await self.guild.set_tickets_today(interaction.guild.id, amount):
+            await interaction.followup.send(embed=save_error_embed(), ephemeral=True)
+            return
         guild_data = await self.guild.get_guild(interaction.guild.id)
         await self._update_order_panel(interaction.guild.id, guild_data.get("status", "Closed"))
         
         embed = make_embed("Count updated", f"Tickets created today set to: **{amount}**", discord.Color.green())
         await interaction.followup.send(embed=embed, ephemeral=True)
 
+    @app_commands.command(name="throttle", description="[ADMIN] Show order button throttling stats")
+    async def throttle_stats(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        if not interaction.user.guild_permissions.administrator:
+            embed = make_embed(":no_entry: Error!", "You need to be an administrator to run this command!", discord.Color.red())
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        stats = self.throttle.stats()
+        rejected = ", ".join(f"{action}: {count}" for action, count in stats["rejected"].items()) or "None"
+        deduped = ", ".join(f"{action}: {count}" for action, count in stats["deduped"].items()) or "None"
+        description = (
+            f"**Rate limit buckets (guild, user, action):** {stats['buckets']}\n"
+            f"**Running or recent calls:** {stats['inflight']}\n"
+            f"**Rejected:** {rejected}\n"
+            f"**Deduped:** {deduped}"
+        )
+        embed = make_embed("Throttle stats", description, discord.Color.blurple())
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="profile", description="[ADMIN] Sample-profile a handler into a local file")
+    @app_commands.describe(handler="The handler to profile", seconds="How long to collect samples for (1-300)")
+    @app_commands.choices(handler=[
+        app_commands.Choice(name="Start Order", value="create_ticket"),
+        app_commands.Choice(name="Notify Me", value="notify_me"),
+        app_commands.Choice(name="Close Ticket", value="close_ticket"),
+        app_commands.Choice(name="Order panel update", value="update_order_panel"),
+    ])
+    async def profile_handler(self, interaction: discord.Interaction, handler: app_commands.Choice[str], seconds: int = 60):
+        await interaction.response.defer(ephemeral=True)
+        if not interaction.user.guild_permissions.administrator:
+            embed = make_embed(":no_entry: Error!", "You need to be an administrator to run this command!", discord.Color.red())
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        watchdog = getattr(self.bot, "watchdog", None)
+        if watchdog is None:
+            embed = make_embed(":no_entry: Error!", "The loop watchdog is disabled. Set `LOOP_WATCHDOG=1` to enable it.", discord.Color.red())
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        if not 1 <= seconds <= 300:
+            embed = make_embed(":no_entry: Error!", "Seconds must be between 1 and 300!", discord.Color.red())
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        # The button callbacks hand their work to these helpers, so sample those
+        targets = {
+            "create_ticket": OrderView._create_ticket,
+            "notify_me": OrderView._toggle_notify,
+            "close_ticket": CloseTicketView.close_ticket,
+            "update_order_panel": Admin._update_order_panel,
+        }
+        try:
+            path, samples = await watchdog.profile(targets[handler.value].__code__, seconds)
+        except Exception as e:
+            embed = make_embed(":no_entry: Error!", str(e), discord.Color.red())
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        description = (
+            f"**Handler:** {handler.name}\n"
+            f"**Samples:** {samples}\n"
+            f"**Event loop lag:** {watchdog.lag * 1000:.0f}ms (max {watchdog.max_lag * 1000:.0f}ms)\n"
+            f"**Stalls logged:** {watchdog.stalls}\n"
+            f"**File:** `{path}`"
+        )
+        embed = make_embed("Profile complete", description, discord.Color.green())
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @app_commands.command(name="help", description="Displays the available command list")
     async def help_command(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
@@ -271,6 +382,8 @@ class Admin(commands.Cog):
             "`/open` – Open order creation and notify users\n"
             "`/unpause` – Re-open order creation and notify users\n"
             "`/close` – Completely close order creation\n"
+            "`/throttle` – Show order button throttling stats\n"
+            "`/profile <handler> [seconds]` – Sample-profile a handler into a local file\n"
             "`/help` – Displays this help message"
         )
         embed = discord.Embed(description=description, color=discord.Color.blurple())
@@ -284,7 +397,9 @@ class Admin(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        await self.guild.update_status(interaction.guild.id, "Paused")
+        if not await self.guild.update_status(interaction.guild.id, "Paused"):
+            await interaction.followup.send(embed=save_error_embed(), ephemeral=True)
+            return
         await self._update_order_panel(interaction.guild.id, "Paused")
         embed = make_embed("Store paused", "Users will be added to the notify list.", discord.Color.orange())
         await interaction.followup.send(embed=embed, ephemeral=True)
@@ -317,16 +432,21 @@ class Admin(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        await self.guild.update_status(interaction.guild.id, "Closed")
+        if not await self.guild.update_status(interaction.guild.id, "Closed"):
+            await interaction.followup.send(embed=save_error_embed(), ephemeral=True)
+            return
         await self._update_order_panel(interaction.guild.id, "Closed")
         embed = make_embed("Store closed", "Orders are now closed.", discord.Color.red())
         await interaction.followup.send(embed=embed, ephemeral=True)
 
     async def _open_and_notify(self, interaction: discord.Interaction):
         guild_data = await self.guild.get_guild(interaction.guild.id)
-        notify_list = guild_data.get("notify", [])
+        # Copy, the stored list is shared and may change while we send DMs
+        notify_list = list(guild_data.get("notify", []))
 
-        await self.guild.update_status(interaction.guild.id, "Open")
+        if not await self.guild.update_status(interaction.guild.id, "Open"):
+            await interaction.followup.send(embed=save_error_embed(), ephemeral=True)
+            return
         await self._update_order_panel(interaction.guild.id, "Open")
         embed = make_embed("Store open", "The store can now accept orders!", discord.Color.green())
         await interaction.followup.send(embed=embed, ephemeral=True)
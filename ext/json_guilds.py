@@ -1,9 +1,12 @@
 import os
 import json
+import asyncio
 import aiofiles
 import traceback
 from typing import Literal
 
+from ext.json_writer import JsonWriter
+
 class Guilds:
     
     def __init__(self):
@@ -19,35 +22,50 @@ class Guilds:
         if not os.path.exists(self.file_path):
             with open(self.file_path, 'w') as f:
                 json.dump({}, f)
+
+        # In-memory copy shared by all coroutines; the writer persists it
+        self._data = None
+        self._load_lock = asyncio.Lock()
+        self.writer = JsonWriter(self.file_path)
     
     async def _load_data(self) -> dict:
-        """Load data from JSON file."""
-        try:
-            async with aiofiles.open(self.file_path, 'r') as f:
-                content = await f.read()
-                return json.loads(content) if content else {}
-        except Exception as e:
-            print(f"Error loading guilds data: {e}")
-            return {}
+        """Load data from JSON file once and return the shared in-memory copy."""
+        if self._data is not None:
+            return self._data
+        async with self._load_lock:
+            if self._data is not None:
+                return self._data
+            try:
+                async with aiofiles.open(self.file_path, 'r') as f:
+                    content = await f.read()
+                    self._data = json.loads(content) if content else {}
+                    self.writer.mark_durable(content)
+            except Exception as e:
+                print(f"Error loading guilds data: {e}")
+                return {}
+            return self._data
     
     async def _save_data(self, data: dict):
-        """Save data to JSON file."""
+        """Queue data for the background writer and wait until it is on disk.
+
+        Raises if the write fails. The writer has rolled the in-memory copy back
+        to what is on disk by then.
+        """
         try:
-            async with aiofiles.open(self.file_path, 'w') as f:
-                await f.write(json.dumps(data, indent=2))
+            await self.writer.commit(data)
         except Exception as e:
             print(f"Error saving guilds data: {e}")
-            traceback.print_exc()
+            raise
     
     async def close(self):
-        """Close method for compatibility (no-op for JSON storage)."""
-        pass
+        """Flush pending writes and stop the background writer."""
+        await self.writer.close()
     
     async def does_guild_exist(self, guild_id: int) -> bool:
         data = await self._load_data()
         return str(guild_id) in data
     
-    async def insert_guild(self, guild_id: int, order_channel: int, order_message: int, category_id: int):
+    async def insert_guild(self, guild_id: int, order_channel: int, order_message: int, category_id: int) -> bool:
         try:
             if await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} already exists!")
@@ -65,8 +83,10 @@ class Guilds:
                 "status": "Closed"  # LITERAL "Closed", "Open", "Paused"
             }
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
     async def get_guild(self, guild_id: int) -> dict:
         if not await self.does_guild_exist(guild_id):
@@ -74,7 +94,7 @@ class Guilds:
         data = await self._load_data()
         return data[str(guild_id)]
     
-    async def update_order_channel(self, guild_id: int, channel_id: int):
+    async def update_order_channel(self, guild_id: int, channel_id: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -82,10 +102,12 @@ class Guilds:
             data = await self._load_data()
             data[str(guild_id)]["order_channel"] = channel_id
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def update_order_message(self, guild_id: int, message_id: int):
+    async def update_order_message(self, guild_id: int, message_id: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -93,10 +115,12 @@ class Guilds:
             data = await self._load_data()
             data[str(guild_id)]["order_message"] = message_id
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def update_status(self, guild_id: int, status: Literal["Open", "Closed", "Paused"]):
+    async def update_status(self, guild_id: int, status: Literal["Open", "Closed", "Paused"]) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -104,10 +128,12 @@ class Guilds:
             data = await self._load_data()
             data[str(guild_id)]["status"] = status
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def add_notify(self, guild_id: int, user: int):
+    async def add_notify(self, guild_id: int, user: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -116,10 +142,12 @@ class Guilds:
             if user not in data[str(guild_id)]["notify"]:
                 data[str(guild_id)]["notify"].append(user)
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def remove_notify(self, guild_id: int, user: int):
+    async def remove_notify(self, guild_id: int, user: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -128,10 +156,12 @@ class Guilds:
             if user in data[str(guild_id)]["notify"]:
                 data[str(guild_id)]["notify"].remove(user)
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def clear_notifies(self, guild_id: int):
+    async def clear_notifies(self, guild_id: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -139,10 +169,12 @@ class Guilds:
             data = await self._load_data()
             data[str(guild_id)]["notify"] = []
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def increment_tickets_today(self, guild_id: int):
+    async def increment_tickets_today(self, guild_id: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -150,10 +182,12 @@ class Guilds:
             data = await self._load_data()
             data[str(guild_id)]["tickets_today"] = data[str(guild_id)].get("tickets_today", 0) + 1
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def set_ticket_limit(self, guild_id: int, limit: int):
+    async def set_ticket_limit(self, guild_id: int, limit: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -161,10 +195,12 @@ class Guilds:
             data = await self._load_data()
             data[str(guild_id)]["ticket_limit"] = limit
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def set_tickets_today(self, guild_id: int, amount: int):
+    async def set_tickets_today(self, guild_id: int, amount: int) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -172,10 +208,12 @@ class Guilds:
             data = await self._load_data()
             data[str(guild_id)]["tickets_today"] = amount
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
-    async def reset_daily_tickets(self, guild_id: int, date_str: str):
+    async def reset_daily_tickets(self, guild_id: int, date_str: str) -> bool:
         try:
             if not await self.does_guild_exist(guild_id):
                 raise Exception(f"Guild with ID {guild_id} does not exist on database!")
@@ -184,5 +222,7 @@ class Guilds:
             data[str(guild_id)]["tickets_today"] = 0
             data[str(guild_id)]["last_reset"] = date_str
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
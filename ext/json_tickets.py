@@ -1,8 +1,11 @@
 import os
 import json
+import asyncio
 import aiofiles
 import traceback
 
+from ext.json_writer import JsonWriter
+
 class Tickets:
     
     def __init__(self):
@@ -18,35 +21,50 @@ class Tickets:
         if not os.path.exists(self.file_path):
             with open(self.file_path, 'w') as f:
                 json.dump({}, f)
+
+        # In-memory copy shared by all coroutines; the writer persists it
+        self._data = None
+        self._load_lock = asyncio.Lock()
+        self.writer = JsonWriter(self.file_path)
     
     async def _load_data(self) -> dict:
-        """Load data from JSON file."""
-        try:
-            async with aiofiles.open(self.file_path, 'r') as f:
-                content = await f.read()
-                return json.loads(content) if content else {}
-        except Exception as e:
-            print(f"Error loading tickets data: {e}")
-            return {}
+        """Load data from JSON file once and return the shared in-memory copy."""
+        if self._data is not None:
+            return self._data
+        async with self._load_lock:
+            if self._data is not None:
+                return self._data
+            try:
+                async with aiofiles.open(self.file_path, 'r') as f:
+                    content = await f.read()
+                    self._data = json.loads(content) if content else {}
+                    self.writer.mark_durable(content)
+            except Exception as e:
+                print(f"Error loading tickets data: {e}")
+                return {}
+            return self._data
     
     async def _save_data(self, data: dict):
-        """Save data to JSON file."""
+        """Queue data for the background writer and wait until it is on disk.
+
+        Raises if the write fails. The writer has rolled the in-memory copy back
+        to what is on disk by then.
+        """
         try:
-            async with aiofiles.open(self.file_path, 'w') as f:
-                await f.write(json.dumps(data, indent=2))
+            await self.writer.commit(data)
         except Exception as e:
             print(f"Error saving tickets data: {e}")
-            traceback.print_exc()
+            raise
     
     async def close(self):
-        """Close method for compatibility (no-op for JSON storage)."""
-        pass
+        """Flush pending writes and stop the background writer."""
+        await self.writer.close()
     
     async def does_ticket_exist(self, ticket_id: int) -> bool:
         data = await self._load_data()
         return str(ticket_id) in data
     
-    async def insert_ticket(self, ticket_id: int, user_id: int):
+    async def insert_ticket(self, ticket_id: int, user_id: int) -> bool:
         try:
             if await self.does_ticket_exist(ticket_id):
                 raise Exception(f"Ticket with ID {ticket_id} already exists!")
@@ -57,8 +75,10 @@ class Tickets:
                 "user_id": user_id
             }
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
     
     async def get_ticket(self, ticket_id: int) -> dict:
         if not await self.does_ticket_exist(ticket_id):
@@ -66,13 +86,15 @@ class Tickets:
         data = await self._load_data()
         return data[str(ticket_id)]
     
-    async def remove_ticket(self, ticket_id: int):
+    async def remove_ticket(self, ticket_id: int) -> bool:
         try:
             if not await self.does_ticket_exist(ticket_id):
-                return
+                return True
             
             data = await self._load_data()
             del data[str(ticket_id)]
             await self._save_data(data)
+            return True
         except:
             traceback.print_exc()
+            return False
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import json
+import asyncio
+import traceback
+
+
+class JsonWriter:
+    """Background group-commit writer for a single JSON file.
+
+    Stores hand their in-memory data to ``commit`` after every mutation. The
+    writer waits for a short commit window, serializes the latest data once
+    and replaces the file atomically (temp file, fsync, rename). Every caller
+    that committed during the window is resolved by that one write.
+
+    If a write fails, the data is rolled back in place to the last durable
+    snapshot. Every commit in that batch, and every commit queued while it
+    was being written, fails with the write error.
+    """
+
+    def __init__(self, file_path: str, window: float = 0.05):
+        self.file_path = file_path
+        self.window = window
+        self.commits = 0
+        self.writes = 0
+        self._data = None
+        self._durable: str | None = None
+        self._waiters: list[asyncio.Future] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    async def commit(self, data: dict):
+        """Queue ``data`` for writing and wait until it is durable on disk."""
+        if self._closed:
+            raise RuntimeError(f"Writer for {self.file_path} is closed!")
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._data = data
+        self._waiters.append(future)
+        self.commits += 1
+        self._wakeup.set()
+        # Shield so a cancelled caller does not cancel the shared write
+        await asyncio.shield(future)
+
+    def mark_durable(self, content: str):
+        """Record ``content`` as what is currently on disk, used for rollbacks."""
+        self._durable = content
+
+    async def close(self):
+        """Flush pending changes and stop the background task."""
+        self._closed = True
+        if self._task is None:
+            return
+        self._wakeup.set()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if not self._closed:
+                await asyncio.sleep(self.window)
+            self._wakeup.clear()
+
+            waiters, self._waiters = self._waiters, []
+            data, self._data = self._data, None
+            if waiters:
+                await self._flush(data, waiters)
+
+            if self._closed and not self._waiters:
+                return
+
+    async def _flush(self, data: dict, waiters: list[asyncio.Future]):
+        try:
+            # Serialize on the loop so the snapshot cannot change mid-dump
+            content = json.dumps(data, indent=2)
+            await asyncio.get_running_loop().run_in_executor(None, self._write_atomic, content)
+            self.writes += 1
+        except Exception as e:
+            traceback.print_exc()
+            # Commits queued during the write were made on top of the failed
+            # changes, so they are rolled back and failed along with them
+            waiters = waiters + self._waiters
+            self._waiters, self._data = [], None
+            self._rollback(data)
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._durable = content
+
+        for future in waiters:
+            if not future.done():
+                future.set_result(None)
+
+    def _rollback(self, data: dict):
+        durable = self._durable
+        if durable is None:
+            with open(self.file_path, 'r') as f:
+                durable = f.read()
+        # Restore in place, the store and its callers share this dict
+        data.clear()
+        data.update(json.loads(durable) if durable else {})
+
+    def _write_atomic(self, content: str):
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+        # Persist the rename itself (directories cannot be opened on Windows)
+        if os.name == "nt":
+            return
+        dir_fd = os.open(os.path.dirname(self.file_path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import time
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Hashable
+
+
+class ThrottledError(Exception):
+    """Raised when a key has used up its rate limit."""
+
+    def __init__(self, key: Hashable, retry_after: float):
+        super().__init__(f"{key} is rate limited, retry in {retry_after:.1f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class InteractionThrottle:
+    """In-memory token bucket limiter with in-flight request dedupe.
+
+    Keys are ``(guild_id, user_id, action)`` tuples. Each action gets its own
+    bucket size and refill period from ``limits``. While a call for a key is
+    running, further clicks for the same key share its result instead of
+    running again, but still use a token. A successful result is kept for
+    ``linger`` seconds after the call finishes, so a late double click gets
+    it back for free. Idle buckets are evicted after ``ttl`` seconds.
+    """
+
+    def __init__(self, limits: dict[str, tuple[int, float]] | None = None, default: tuple[int, float] = (2, 5.0), linger: float = 2.0, ttl: float = 300.0):
+        self.limits = limits or {}
+        self.default = default
+        self.linger = linger
+        self.ttl = ttl
+        self.rejected = Counter()
+        self.deduped = Counter()
+        self._buckets: dict[Hashable, list[float]] = {}
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._last_sweep = time.monotonic()
+
+    def admit(self, key: tuple, factory: Callable[[], Awaitable]) -> asyncio.Task:
+        """Return the task whose result answers this click for ``key``.
+
+        This is either a recently finished call, a running call, or a new
+        call of ``factory()``. Raises ``ThrottledError`` when a running call
+        is joined or a new one started with no tokens left. The decision and
+        the new call happen together, so no other click can slip in between.
+        """
+        action = key[-1]
+        task = self._inflight.get(key)
+        if task is not None and task.done():
+            if not task.cancelled() and task.exception() is None:
+                self.deduped[action] += 1
+                return task
+            # Failed calls are not reused, their cleanup may just not have run
+            task = None
+
+        retry_after = self._take(key, action)
+        if retry_after:
+            self.rejected[action] += 1
+            raise ThrottledError(key, retry_after)
+
+        if task is not None:
+            self.deduped[action] += 1
+            return task
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._finished(key, task))
+        return task
+
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self._buckets),
+            "inflight": len(self._inflight),
+            "rejected": dict(self.rejected),
+            "deduped": dict(self.deduped),
+        }
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if task.cancelled() or task.exception() is not None:
+            self._inflight.pop(key, None)
+            return
+        asyncio.get_running_loop().call_later(self.linger, self._forget, key, task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def _take(self, key: Hashable, action: str) -> float:
+        """Take one token for ``key``; return 0 on success or seconds to wait."""
+        now = time.monotonic()
+        self._sweep(now)
+
+        capacity, per = self.limits.get(action, self.default)
+        rate = capacity / per
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+        bucket[0] = tokens - 1
+        return 0
+
+    def _sweep(self, now: float):
+        if now - self._last_sweep < self.ttl:
+            return
+        self._last_sweep = now
+        stale = [key for key, bucket in self._buckets.items() if now - bucket[1] >= self.ttl]
+        for key in stale:
+            del self._buckets[key]
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+import asyncio
+import datetime
+import threading
+import traceback
+from collections import Counter, deque
+from types import CodeType
+
+
+class LoopWatchdog:
+    """Opt-in event loop health monitor.
+
+    A heartbeat task sleeps in short intervals, and ``lag`` is how late it
+    woke up compared to when it was scheduled to. A separate daemon
+    thread watches the heartbeat and, when the loop has not ticked for longer
+    than ``threshold`` seconds, prints the stack of whatever is blocking it.
+    The same thread can sample the loop's stack while a chosen handler is
+    running and write the samples to a folded-stack file.
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1, sample_interval: float = 0.005, profile_dir: str = os.path.join("data", "profiles")):
+        self.threshold = threshold
+        # Tick well inside the threshold so a normal sleep never looks like a stall
+        self.interval = min(interval, threshold / 4)
+        self.sample_interval = sample_interval
+        # A loop that never recovers is still reported after this many seconds
+        self.hang_report = max(10.0, threshold * 10)
+        self.profile_dir = profile_dir
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._expected = time.monotonic()
+        self._late = deque(maxlen=100)
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._profile_lock = threading.Lock()
+        self._profile: tuple[CodeType, Counter] | None = None
+
+    def start(self):
+        """Start monitoring the running loop. Must be called from the loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._expected = time.monotonic() + self.interval
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"Loop watchdog started (threshold {self.threshold * 1000:.0f}ms)")
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def profile(self, code: CodeType, seconds: float) -> tuple[str, int]:
+        """Sample stacks running ``code`` for ``seconds`` and write them to a file.
+
+        Returns the file path and the number of samples taken.
+        """
+        if self._profile is not None:
+            raise Exception("A profile is already running!")
+
+        with self._profile_lock:
+            self._profile = (code, Counter())
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            with self._profile_lock:
+                _, samples = self._profile
+                self._profile = None
+
+        if not os.path.exists(self.profile_dir):
+            os.makedirs(self.profile_dir)
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.profile_dir, f"{code.co_name.strip('_')}-{stamp}.folded")
+        content = "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+        await asyncio.get_running_loop().run_in_executor(None, self._write_profile, path, content)
+        return path, sum(samples.values())
+
+    @staticmethod
+    def _write_profile(path: str, content: str):
+        with open(path, 'w') as f:
+            f.write(content)
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            self._expected = expected
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, time.monotonic() - expected)
+            self.max_lag = max(self.max_lag, self.lag)
+            if self.lag > self.threshold / 2:
+                # Hand late wake-ups to the monitor thread, which has the stack
+                self._late.append((expected, self.lag))
+
+    def _monitor(self):
+        stall = None
+        while not self._stopped.is_set():
+            profiling = self._profile is not None
+            time.sleep(self.sample_interval if profiling else self.threshold / 10)
+
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+
+            if profiling:
+                self._sample(frame)
+
+            # Read the schedule first, any wake-up before it is already queued
+            expected = self._expected
+            while self._late:
+                late_expected, lag = self._late.popleft()
+                if stall is not None and late_expected == stall[0]:
+                    if lag > self.threshold:
+                        self._report(lag, stall[1])
+                    stall = None
+            if stall is not None and stall[0] != expected:
+                # The loop ticked again without being late enough to matter
+                stall = None
+
+            overdue = time.monotonic() - expected
+            if stall is None and overdue > self.threshold / 2:
+                # Grab the stack early, while it is still holding the loop
+                stall = (expected, "".join(traceback.format_stack(frame)))
+            elif stall is not None and stall[1] is not None and overdue > self.hang_report:
+                self._report(overdue, stall[1], hung=True)
+                stall = (expected, None)
+
+        if stall is not None and time.monotonic() - stall[0] > self.threshold:
+            self._report(time.monotonic() - stall[0], stall[1])
+
+    def _report(self, blocked: float, stack: str | None, hung: bool = False):
+        if stack is None:
+            return
+        self.stalls += 1
+        state = "has been blocked" if hung else "was blocked"
+        print(f"Event loop {state} for {blocked * 1000:.0f}ms in:\n{stack}", end="")
+
+    def _sample(self, frame):
+        with self._profile_lock:
+            if self._profile is None:
+                return
+            code, samples = self._profile
+
+            stack = []
+            matched = False
+            while frame is not None:
+                matched = matched or frame.f_code is code
+                stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if matched:
+                samples[";".join(reversed(stack))] += 1
@@ -0,0 +1,101 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+from ext.json_writer import JsonWriter
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_concurrent_commits_share_one_write(tmp_path):
+    path = tmp_path / "data.json"
+
+    async def main():
+        writer = JsonWriter(str(path))
+        data = {}
+
+        async def mutate(i):
+            data[str(i)] = i
+            await writer.commit(data)
+
+        await asyncio.gather(*(mutate(i) for i in range(50)))
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(main())
+    assert writer.commits == 50
+    assert writer.writes == 1
+    assert read(path) == {str(i): i for i in range(50)}
+    assert not (tmp_path / "data.json.tmp").exists()
+
+
+def test_close_flushes_pending_commit(tmp_path):
+    path = tmp_path / "data.json"
+
+    async def main():
+        writer = JsonWriter(str(path), window=10)
+        commit = asyncio.ensure_future(writer.commit({"a": 1}))
+        await asyncio.sleep(0)
+        await writer.close()
+        await commit
+
+    asyncio.run(main())
+    assert read(path) == {"a": 1}
+
+
+def test_commit_after_close_raises(tmp_path):
+    async def main():
+        writer = JsonWriter(str(tmp_path / "data.json"))
+        await writer.close()
+        await writer.commit({})
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+
+
+def test_failed_write_rolls_back_batch_and_queued_commits(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"notify": []}))
+
+    async def main():
+        writer = JsonWriter(str(path), window=0)
+        writer.mark_durable(path.read_text())
+        data = {"notify": []}
+
+        writing = threading.Event()
+        release = threading.Event()
+        write_atomic = writer._write_atomic
+
+        def failing_write(content):
+            writing.set()
+            release.wait()
+            raise OSError("disk full")
+
+        writer._write_atomic = failing_write
+        data["notify"].append(1)
+        first = asyncio.ensure_future(writer.commit(data))
+
+        # Mutate while the failing write is still in the executor
+        await asyncio.get_running_loop().run_in_executor(None, writing.wait)
+        data["notify"].append(2)
+        second = asyncio.ensure_future(writer.commit(data))
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        assert all(isinstance(result, OSError) for result in results)
+        assert data == {"notify": []}
+
+        # A later commit writes only changes made after the rollback
+        writer._write_atomic = write_atomic
+        data["notify"].append(3)
+        await writer.commit(data)
+        await writer.close()
+
+    asyncio.run(main())
+    assert read(path) == {"notify": [3]}
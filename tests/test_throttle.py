@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from ext.throttle import InteractionThrottle, ThrottledError
+
+
+KEY = (1, 2, "create_ticket")
+
+
+def make_handler(delay=0.0):
+    calls = []
+
+    async def handler():
+        calls.append(len(calls) + 1)
+        await asyncio.sleep(delay)
+        return len(calls)
+
+    return handler, calls
+
+
+def test_click_during_running_call_shares_result():
+    async def main():
+        throttle = InteractionThrottle(limits={"create_ticket": (2, 10.0)})
+        handler, calls = make_handler(delay=0.05)
+        first = throttle.admit(KEY, handler)
+        second = throttle.admit(KEY, handler)
+        assert first is second
+        assert await first == 1
+        return throttle, calls
+
+    throttle, calls = asyncio.run(main())
+    assert calls == [1]
+    assert throttle.stats()["deduped"] == {"create_ticket": 1}
+
+
+def test_joining_running_call_uses_a_token():
+    async def main():
+        throttle = InteractionThrottle(limits={"create_ticket": (1, 10.0)})
+        handler, _ = make_handler(delay=0.05)
+        task = throttle.admit(KEY, handler)
+        with pytest.raises(ThrottledError):
+            throttle.admit(KEY, handler)
+        await task
+        return throttle
+
+    throttle = asyncio.run(main())
+    assert throttle.stats()["rejected"] == {"create_ticket": 1}
+
+
+def test_finished_result_is_reused_until_linger_ends():
+    async def main():
+        throttle = InteractionThrottle(limits={"create_ticket": (1, 10.0)}, linger=0.05)
+        handler, calls = make_handler()
+        first = throttle.admit(KEY, handler)
+        await first
+
+        # A late double click gets the finished result without a token
+        again = throttle.admit(KEY, handler)
+        assert again is first and again.done()
+
+        # Holding the admitted task across an await (like a defer) is safe
+        # even if the linger window ends meanwhile
+        await asyncio.sleep(0.1)
+        assert await again == 1
+
+        with pytest.raises(ThrottledError):
+            throttle.admit(KEY, handler)
+        return throttle, calls
+
+    throttle, calls = asyncio.run(main())
+    assert calls == [1]
+    assert throttle.stats() == {
+        "buckets": 1,
+        "inflight": 0,
+        "rejected": {"create_ticket": 1},
+        "deduped": {"create_ticket": 1},
+    }
+
+
+def test_failed_call_is_not_reused():
+    async def main():
+        throttle = InteractionThrottle(limits={"notify_me": (2, 10.0)})
+        key = (1, 2, "notify_me")
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await throttle.admit(key, failing)
+        handler, calls = make_handler()
+        assert await throttle.admit(key, handler) == 1
+        return calls
+
+    assert asyncio.run(main()) == [1]
+
+
+def test_tokens_refill_per_action():
+    throttle = InteractionThrottle(limits={"notify_me": (1, 0.05)})
+    key = (1, 2, "notify_me")
+    assert throttle._take(key, "notify_me") == 0
+    assert throttle._take(key, "notify_me") > 0
+    assert throttle._take((1, 3, "notify_me"), "notify_me") == 0
+
+
+def test_idle_buckets_are_evicted_after_ttl():
+    throttle = InteractionThrottle(ttl=0.05)
+    throttle._take((1, 2, "notify_me"), "notify_me")
+    assert throttle.stats()["buckets"] == 1
+
+    throttle._last_sweep -= 1
+    for bucket in throttle._buckets.values():
+        bucket[1] -= 1
+    throttle._take((1, 3, "notify_me"), "notify_me")
+    assert list(throttle._buckets) == [(1, 3, "notify_me")]
@@ -0,0 +1,88 @@
+import time
+import asyncio
+
+from ext.watchdog import LoopWatchdog
+
+
+async def block_after_tick(watchdog, seconds):
+    # Start blocking right after a heartbeat so the whole block is late
+    expected = watchdog._expected
+    while watchdog._expected == expected:
+        await asyncio.sleep(0.001)
+    time.sleep(seconds)
+    await asyncio.sleep(watchdog.threshold)
+
+
+def test_stalls_over_threshold_are_reported_once_with_stack(capsys):
+    async def main():
+        watchdog = LoopWatchdog(threshold=0.2)
+        watchdog.start()
+        try:
+            await block_after_tick(watchdog, 0.1)
+            await block_after_tick(watchdog, 0.45)
+        finally:
+            watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(main())
+    out = capsys.readouterr().out
+    assert watchdog.stalls == 1
+    assert out.count("Event loop was blocked for") == 1
+    assert "block_after_tick" in out
+    # Measured from the scheduled wake-up, not from the previous tick
+    assert 0.3 < watchdog.max_lag < 0.45
+
+
+def test_callbacks_under_threshold_are_not_reported(capsys):
+    async def main():
+        watchdog = LoopWatchdog(threshold=0.2)
+        watchdog.start()
+        try:
+            for _ in range(3):
+                await block_after_tick(watchdog, 0.18)
+        finally:
+            watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(main())
+    assert watchdog.stalls == 0
+    assert "blocked" not in capsys.readouterr().out
+
+
+def test_healthy_loop_has_no_lag():
+    async def main():
+        watchdog = LoopWatchdog(threshold=0.2)
+        watchdog.start()
+        await asyncio.sleep(0.3)
+        watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(main())
+    assert watchdog.max_lag < 0.03
+
+
+def test_profile_samples_only_the_target(tmp_path):
+    def blocking():
+        time.sleep(0.1)
+
+    async def handler():
+        blocking()
+
+    async def main():
+        watchdog = LoopWatchdog(threshold=1.0, profile_dir=str(tmp_path))
+        watchdog.start()
+        try:
+            profile = asyncio.ensure_future(watchdog.profile(handler.__code__, 0.3))
+            await asyncio.sleep(0.05)
+            await handler()
+            time.sleep(0.05)
+            return await profile
+        finally:
+            watchdog.stop()
+
+    path, samples = asyncio.run(main())
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert samples > 0
+    assert all("handler;" in line and line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("blocking" in line for line in lines)
@@ -4,6 +4,8 @@ import asyncio
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from ext.watchdog import LoopWatchdog
+
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
@@ -11,6 +13,7 @@ intents.message_content = True
 prefix = ["tpf!", "TPF!"]
 
 client = commands.Bot(command_prefix=prefix, case_insensitive=True, intents=intents)
+client.watchdog = None
 
 @client.event
 async def on_ready():
@@ -39,7 +42,14 @@ async def load():
 async def main():
     await load()
     load_dotenv()
-    await client.start(os.getenv("BOT_TOKEN"))
+    if os.getenv("LOOP_WATCHDOG") == "1":
+        client.watchdog = LoopWatchdog(threshold=float(os.getenv("LOOP_WATCHDOG_THRESHOLD", "0.25")))
+        client.watchdog.start()
+    try:
+        await client.start(os.getenv("BOT_TOKEN"))
+    finally:
+        if client.watchdog is not None:
+            client.watchdog.stop()
 
 if __name__ == "__main__":
     load_dotenv()